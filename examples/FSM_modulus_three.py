@@ -6,25 +6,47 @@ from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine
 
 # An explanation for how to derive the state transitions for a given modulus can be found at
 # https://electronics.stackexchange.com/questions/345189/vhdl-interview-question-detecting-if-a-number-can-be-divided-by-5-without-rema
+# Each state is the remainder of the bits read so far, so the final state is the answer
 STATE_TRANSITIONS = {
-    ("S0", "0"): "S0",
-    ("S0", "1"): "S1",
-    ("S1", "0"): "S2",
-    ("S1", "1"): "S0",
-    ("S2", "0"): "S1",
-    ("S2", "1"): "S2",
+    (0, "0"): 0,
+    (0, "1"): 1,
+    (1, "0"): 2,
+    (1, "1"): 0,
+    (2, "0"): 1,
+    (2, "1"): 2,
 }
 
-ALL_STATES = frozenset(["S0", "S1", "S2"])
+ALL_STATES = frozenset([0, 1, 2])
 
 FSM = LazyFiniteStateMachine(
     transition_delta=lambda state, input_symbol: STATE_TRANSITIONS[(state, input_symbol)],
-    initial_state_q0="S0",
+    initial_state_q0=0,
     all_states_Q=ALL_STATES,
     final_states_F=ALL_STATES,
 )
 
-STATE_TO_MOD = {"S0": 0, "S1": 1, "S2": 2}
+# Inputs are consumed up to CHUNK_SIZE bits at a time by `mod_three_fast`
+CHUNK_SIZE = 8
+
+
+def _build_chunk_transitions() -> dict[str, tuple[int, ...]]:
+    """Compose the FSM's transitions over every binary string of length 1 to
+    CHUNK_SIZE, recording the state reached from each possible starting state."""
+    chunk_transitions = {}
+    for length in range(1, CHUNK_SIZE + 1):
+        for value in range(2**length):
+            chunk = format(value, f"0{length}b")
+            reached = []
+            for start_state in sorted(ALL_STATES):
+                state = start_state
+                for bit in chunk:
+                    state = FSM.step(state, bit)
+                reached.append(state)
+            chunk_transitions[chunk] = tuple(reached)
+    return chunk_transitions
+
+
+CHUNK_TRANSITIONS = _build_chunk_transitions()
 
 
 def mod_three(binary_string: str) -> int:
@@ -32,18 +54,40 @@ def mod_three(binary_string: str) -> int:
         raise ValueError("Modulus is computed on strings of `1` and `0` - please provide one")
     if len(binary_string) == 0:
         raise ValueError("Please provide an input number")
-    final_state = FSM.process_and_check(binary_string)
-    return STATE_TO_MOD[final_state]
+    remainder: int = FSM.process_and_check(binary_string)
+    return remainder
+
+
+def mod_three_fast(binary_string: str) -> int:
+    """Equivalent to `mod_three`, but takes one lookup per CHUNK_SIZE bits
+    instead of one FSM step per bit."""
+    if not isinstance(binary_string, str):
+        raise ValueError("Modulus is computed on strings of `1` and `0` - please provide one")
+    if len(binary_string) == 0:
+        raise ValueError("Please provide an input number")
+    # The initial state loops back to itself on `0`, so leading zeros can be skipped
+    significant_bits = binary_string.lstrip("0")
+    state: int = FSM.initial_state_q0
+    try:
+        for i in range(0, len(significant_bits), CHUNK_SIZE):
+            state = CHUNK_TRANSITIONS[significant_bits[i : i + CHUNK_SIZE]][state]
+    except KeyError:
+        # Not a binary string; let the FSM raise its usual error
+        return mod_three(binary_string)
+    return state
 
 
 if __name__ == "__main__":
     spacing = 8
     print("Finite State Machine: Modulus 3 example\n")
-    print("Number   | Binary  | FSM     | CPython")
-    print((("-" * (spacing + 1) + "|") * 4)[:-1])
+    print("Number   | Binary  | FSM     | FSM fast| CPython")
+    print((("-" * (spacing + 1) + "|") * 5)[:-1])
 
     for i in range(16):
         binary = format(i, "b")
         fsm_result = mod_three(binary)
+        fsm_fast_result = mod_three_fast(binary)
         std_result = i % 3
-        print(f"{i:>{spacing}} |{binary:>{spacing}} |{fsm_result:>{spacing}} |{std_result:>{spacing}}")
+        print(
+            f"{i:>{spacing}} |{binary:>{spacing}} |{fsm_result:>{spacing}} |{fsm_fast_result:>{spacing}} |{std_result:>{spacing}}"
+        )
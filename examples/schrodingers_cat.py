@@ -9,9 +9,10 @@ can only perform experiments which do not kill the cat.
 """
 
 import argparse
+import os
 import sys
+from collections.abc import Iterator
 from enum import Enum
-from random import randint
 
 from lazy_state_machine.exceptions import InvalidFinalStateError
 from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine
@@ -26,16 +27,30 @@ class TimeInput(Enum):
     ATOM_HALF_LIFE = "atom_half_life"
 
 
+# Random bits are read from the operating system this many bytes at a time
+RANDOM_BLOCK_BYTES = 4096
+
+
+def random_bits() -> Iterator[int]:
+    """Endless stream of random bits from `os.urandom`; much cheaper per bit
+    than calling `random.randint(0, 1)`."""
+    while True:
+        for byte in os.urandom(RANDOM_BLOCK_BYTES):
+            for shift in range(8):
+                yield (byte >> shift) & 1
+
+
 def create_schrodingers_fsm(lab_safety: bool = False) -> LazyFiniteStateMachine:
     all_states = frozenset([CatStatus.ALIVE, CatStatus.DEAD])
     final_states = frozenset([CatStatus.ALIVE]) if lab_safety else all_states
+    decay_bits = random_bits()
 
     def transition_function(state: CatStatus, input_symbol: TimeInput) -> CatStatus:
         if state == CatStatus.DEAD:
             return CatStatus.DEAD
         if state == CatStatus.ALIVE:
             # 50/50
-            if randint(0, 1):
+            if next(decay_bits):
                 return CatStatus.DEAD
             return CatStatus.ALIVE
 
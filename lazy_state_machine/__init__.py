@@ -0,0 +1,24 @@
+from lazy_state_machine.exceptions import (
+    CompilationError,
+    IllegalTransitionError,
+    InvalidFinalStateError,
+    InvalidFinalStatesError,
+    InvalidInitialStateError,
+    InvalidInputTokenError,
+    InvalidStateError,
+    TransitionFunctionError,
+)
+from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine, RangeSet
+
+__all__ = [
+    "CompilationError",
+    "IllegalTransitionError",
+    "InvalidFinalStateError",
+    "InvalidFinalStatesError",
+    "InvalidInitialStateError",
+    "InvalidInputTokenError",
+    "InvalidStateError",
+    "LazyFiniteStateMachine",
+    "RangeSet",
+    "TransitionFunctionError",
+]
@@ -0,0 +1,96 @@
+"""
+Inner loops over the tables built by `LazyFiniteStateMachine.compile`.
+
+States and input symbols are referred to by their index; the flat table
+holds the index of the next state at `state_id * n_symbols + symbol_id`, or
+-1 where the transition could not be tabulated. For inputs that are still
+symbol objects, the rows hold the same transitions as one dict per state,
+mapping each symbol straight to the next state id, so a step is a single
+index and dict lookup. Anything not covered by the tables (unknown or
+unhashable symbols, untabulated transitions) is handed to `fallback`,
+which returns the next state id or raises.
+"""
+
+from collections.abc import Iterable
+from typing import Any, Callable
+
+
+def walk_rows(
+    rows: tuple[dict[Any, int], ...],
+    state_id: int,
+    inputs_sigma: Iterable[Any],
+    fallback: Callable[[int, Any], int],
+) -> int:
+    """Follow `rows` from `state_id` over `inputs_sigma` and return the last state id."""
+    for val in inputs_sigma:
+        try:
+            new_state_id = rows[state_id].get(val)
+        except TypeError:
+            # Unhashable input, can't be in the rows
+            new_state_id = None
+        if new_state_id is None:
+            new_state_id = fallback(state_id, val)
+        state_id = new_state_id
+    return state_id
+
+
+def walk_table_ids(
+    table: tuple[int, ...],
+    n_symbols: int,
+    state_id: int,
+    symbol_ids: Iterable[int],
+    fallback: Callable[[int, int], int],
+) -> int:
+    """Follow the flat `table` over inputs already translated to symbol ids, e.g. by `bytes.translate`;
+    `fallback` receives the symbol id rather than the symbol."""
+    for symbol_id in symbol_ids:
+        new_state_id = table[state_id * n_symbols + symbol_id]
+        if new_state_id < 0:
+            new_state_id = fallback(state_id, symbol_id)
+        state_id = new_state_id
+    return state_id
+
+
+def walk_rows_many(
+    rows: tuple[dict[Any, int], ...],
+    start_id: int,
+    sequences: Iterable[Iterable[Any]],
+    fallback: Callable[[int, Any], int],
+) -> list[int]:
+    """`walk_rows` applied to each of several independent input sequences,
+    all starting from `start_id`."""
+    results = []
+    for inputs_sigma in sequences:
+        state_id = start_id
+        for val in inputs_sigma:
+            try:
+                new_state_id = rows[state_id].get(val)
+            except TypeError:
+                new_state_id = None
+            if new_state_id is None:
+                new_state_id = fallback(state_id, val)
+            state_id = new_state_id
+        results.append(state_id)
+    return results
+
+
+def unary_trajectory(table: tuple[int, ...], start_id: int) -> tuple[tuple[int, ...], int]:
+    """States visited from `start_id` by a machine with a single input symbol,
+    where `table[state_id]` is the next state id.
+
+    The trajectory is rho-shaped: a tail followed by a cycle, so the state
+    after `k` inputs is `trajectory[k]` for short inputs and
+    `trajectory[cycle_start + (k - cycle_start) % cycle_length]` afterwards,
+    where `cycle_length = len(trajectory) - cycle_start`. If a transition
+    missing from the table is reached first, there is no cycle and
+    `cycle_start` is -1.
+    """
+    first_visit: dict[int, int] = {}
+    trajectory: list[int] = []
+    state_id = start_id
+    while state_id >= 0 and state_id not in first_visit:
+        first_visit[state_id] = len(trajectory)
+        trajectory.append(state_id)
+        state_id = table[state_id]
+    cycle_start = first_visit[state_id] if state_id >= 0 else -1
+    return tuple(trajectory), cycle_start
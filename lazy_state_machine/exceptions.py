@@ -1,4 +1,5 @@
 __all__ = [
+    "CompilationError",
     "IllegalTransitionError",
     "InvalidFinalStateError",
     "InvalidFinalStatesError",
@@ -35,3 +36,7 @@ class IllegalTransitionError(Exception):
 
 class TransitionFunctionError(Exception):
     pass
+
+
+class CompilationError(Exception):
+    pass
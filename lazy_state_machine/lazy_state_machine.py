@@ -1,7 +1,9 @@
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from typing import Any, Callable, Optional
 
+from lazy_state_machine._kernels import unary_trajectory, walk_rows, walk_rows_many, walk_table_ids
 from lazy_state_machine.exceptions import (
+    CompilationError,
     IllegalTransitionError,
     InvalidFinalStateError,
     InvalidFinalStatesError,
@@ -11,6 +13,48 @@ from lazy_state_machine.exceptions import (
     TransitionFunctionError,
 )
 
+# Alphabet types whose membership test agrees with dict lookups, so a hit in
+# a compiled row proves the input is in `alphabet_sigma`; others, like
+# `RangeSet` which rejects bools equal to its members, are asked directly
+_HASH_EQ_ALPHABETS: frozenset[type] = frozenset((frozenset, set, dict, type({}.keys()), tuple, list, range, str, bytes))
+
+
+def _checked_inputs(inputs_sigma: Iterable[Any], alphabet_contains: Callable[[Any], bool]) -> Iterator[Any]:
+    """`inputs_sigma`, raising InvalidInputTokenError at the first input not in the alphabet."""
+    for val in inputs_sigma:
+        if not alphabet_contains(val):
+            raise InvalidInputTokenError()
+        yield val
+
+
+class RangeSet:
+    """The integers `0` through `n - 1`, usable as `all_states_Q` or
+    `final_states_F` without materializing them in a frozenset;
+    construction and membership tests are O(1).
+
+    Parameters
+    ----------
+    n : int
+        Number of members
+    """
+
+    __slots__ = ("n",)
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def __contains__(self, x: object) -> bool:
+        return type(x) is int and 0 <= x < self.n
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.n))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return f"RangeSet({self.n})"
+
 
 class LazyFiniteStateMachine:
     """Lazy finite state machine that uses a provided function
@@ -50,13 +94,14 @@ class LazyFiniteStateMachine:
         and raised
     initial_state_q0 : Any
         Starting state, one of `all_states_Q`
-    all_states_Q : frozenset[Any]
-        Valid states, may be strings, enums, or any object implementing `__in__`
-    final_states_F : Optional[frozenset[Any]]
+    all_states_Q : Collection[Any]
+        Valid states, may be strings, enums, or any object implementing `__in__`;
+        usually a frozenset, or a `RangeSet` when the states are the integers `0..n-1`
+    final_states_F : Optional[Collection[Any]]
         Valid final states, may be strings, enums, or any object implementing `__in__`;
         this must be a subset of `all_states_Q`. If not specified, all states will be
         considered valid outputs
-    alphabet_sigma : Optional[frozenset[Any]]
+    alphabet_sigma : Optional[Collection[Any]]
         Valid input tokens; if provided, each input character will be required to
         be in this; can be omitted where this is not feasible, e.g.
         all integers or unicode characters including the supplementary planes
@@ -67,15 +112,22 @@ class LazyFiniteStateMachine:
         If any of the specified final states is not in `all_states_Q`
     InvalidInitialStateError
         If any initial_state_q0 not in all_states_Q
+
+    Notes
+    -----
+    When `transition_delta` is deterministic and both `all_states_Q` and
+    `alphabet_sigma` are small enough to enumerate, `compile` can be called
+    to tabulate every transition up front; `process` then walks the table
+    instead of calling `transition_delta` for each input.
     """
 
     def __init__(
         self,
         transition_delta: Callable[[Any, Any], Any],
         initial_state_q0: Any,
-        all_states_Q: frozenset[Any],
-        final_states_F: Optional[frozenset[Any]] = None,
-        alphabet_sigma: Optional[frozenset[Any]] = None,
+        all_states_Q: Collection[Any],
+        final_states_F: Optional[Collection[Any]] = None,
+        alphabet_sigma: Optional[Collection[Any]] = None,
     ) -> None:
         self.transition_delta = transition_delta
         self.initial_state_q0 = initial_state_q0
@@ -89,13 +141,108 @@ class LazyFiniteStateMachine:
         self.alphabet_sigma = alphabet_sigma
 
         # input validation - straightforward, included in __init__ to avoid overengineering
-        for valid_final_state in self.final_states_F:
-            if valid_final_state not in self.all_states_Q:
-                raise InvalidFinalStatesError()
+        if self.final_states_F is not self.all_states_Q:
+            for valid_final_state in self.final_states_F:
+                if valid_final_state not in self.all_states_Q:
+                    raise InvalidFinalStatesError()
 
         if initial_state_q0 not in self.all_states_Q:
             raise InvalidInitialStateError()
 
+        # Bound once so each `step` avoids looking up the containers' methods
+        self._all_states_contains = all_states_Q.__contains__
+        self._alphabet_contains = alphabet_sigma.__contains__ if alphabet_sigma is not None else None
+
+        # Populated by `compile`; states and symbols are replaced by their index
+        self._states: tuple[Any, ...] = ()
+        self._state_to_id: dict[Any, int] = {}
+        self._symbols: tuple[Any, ...] = ()
+        self._symbol_to_id: dict[Any, int] = {}
+        self._table: Optional[tuple[int, ...]] = None
+        # The table split per state, keyed by symbol rather than symbol id
+        self._rows: tuple[dict[Any, int], ...] = ()
+        # Bit `state_id` is set for each state in `final_states_F`
+        self._accepting = 0
+        # For single-symbol alphabets, see `unary_trajectory`
+        self._trajectory: tuple[int, ...] = ()
+        self._cycle_start = -1
+        # Membership test compiled walks must still apply to each input, if any
+        self._check_inputs: Optional[Callable[[Any], bool]] = None
+        # `bytes.translate` table for `process_bytes`, kept for the last symbol_mapper only
+        self._byte_table: Optional[tuple[Callable[[int], Any], bytes]] = None
+
+    def compile(self) -> None:
+        """Evaluate `transition_delta` for every (state, input) pair and store
+        the results in a dense table indexed by `state_id * len(alphabet_sigma) + symbol_id`.
+        Afterwards `process` looks up each transition in the table instead of
+        calling `transition_delta`, and skips the per-input state checks since
+        every entry of the table is already known to be in `all_states_Q`.
+
+        This is only correct if `transition_delta` is deterministic. Pairs for which
+        `transition_delta` raises or returns an invalid state are left out of
+        the table; if one is reached while processing, `step` is called for it
+        so the same exception is raised as in the uncompiled machine.
+
+        A hit in the table stands in for the `alphabet_sigma` membership test
+        when it is a builtin container such as a frozenset or tuple, whose
+        membership agrees with hashing and equality. Any other container,
+        e.g. a `RangeSet`, is still asked about each input so the compiled
+        machine accepts exactly the same inputs.
+
+        If `alphabet_sigma` has a single symbol, the states visited from
+        `initial_state_q0` are also recorded until they start repeating, so
+        `process` on a sequence can find the final state from its length alone.
+
+        Raises
+        ------
+        CompilationError
+            If `alphabet_sigma` was not provided, so the inputs cannot be enumerated,
+            or a state or input symbol is unhashable
+        """
+        if self.alphabet_sigma is None:
+            raise CompilationError()
+
+        states = tuple(self.all_states_Q)
+        symbols = tuple(self.alphabet_sigma)
+        try:
+            state_to_id = {state: i for i, state in enumerate(states)}
+            symbol_to_id = {symbol: i for i, symbol in enumerate(symbols)}
+        except TypeError:
+            # The table is indexed through dicts, so states and symbols must be hashable
+            raise CompilationError() from None
+
+        table = []
+        for state in states:
+            for symbol in symbols:
+                try:
+                    new_state = self.step(state, symbol)
+                except (IllegalTransitionError, InvalidStateError, TransitionFunctionError):
+                    table.append(-1)
+                else:
+                    table.append(state_to_id[new_state])
+
+        self._states = states
+        self._state_to_id = state_to_id
+        self._symbols = symbols
+        self._symbol_to_id = symbol_to_id
+        self._table = tuple(table)
+        n_symbols = len(symbols)
+        self._rows = tuple(
+            {
+                symbol: table[state_id * n_symbols + symbol_id]
+                for symbol_id, symbol in enumerate(symbols)
+                if table[state_id * n_symbols + symbol_id] >= 0
+            }
+            for state_id in range(len(states))
+        )
+        self._accepting = sum(1 << state_id for state_id, state in enumerate(states) if state in self.final_states_F)
+        self._check_inputs = (
+            None if type(self.alphabet_sigma) in _HASH_EQ_ALPHABETS else self.alphabet_sigma.__contains__
+        )
+        self._byte_table = None
+        if len(symbols) == 1:
+            self._trajectory, self._cycle_start = unary_trajectory(self._table, state_to_id[self.initial_state_q0])
+
     def process(self, inputs_sigma: Iterable[Any]) -> Any:
         """Process a provided input, starting with the
         initial state of the machine, and return the state
@@ -116,6 +263,8 @@ class LazyFiniteStateMachine:
 
         Raises
         ------
+        InvalidInputTokenError
+            If an input symbol is not in `alphabet_sigma`
         InvalidStateError
             If `current_state` or `new_state` is not in `all_states_Q`
         IllegalTransitionError
@@ -123,11 +272,170 @@ class LazyFiniteStateMachine:
         TransitionFunctionError
             If the provided `transition_delta` raises any other exception
         """
+        if self._table is not None:
+            return self._states[self._process_compiled(inputs_sigma)]
+
+        # `step` inlined with attributes bound to locals; the current state
+        # was already checked as the previous new state
         state = self.initial_state_q0
+        transition_delta = self.transition_delta
+        all_states_contains = self._all_states_contains
+        alphabet_contains = self._alphabet_contains
         for val in inputs_sigma:
-            state = self.step(state, val)
+            if alphabet_contains is not None and not alphabet_contains(val):
+                raise InvalidInputTokenError()
+            try:
+                state = transition_delta(state, val)
+            except IllegalTransitionError:
+                raise
+            except Exception:
+                raise TransitionFunctionError() from None
+            if not all_states_contains(state):
+                raise InvalidStateError()
         return state
 
+    def _process_compiled(self, inputs_sigma: Iterable[Any]) -> int:
+        """Table-driven equivalent of `process` used once `compile` has been called;
+        returns the id of the last state."""
+        if self._check_inputs is not None:
+            inputs_sigma = _checked_inputs(inputs_sigma, self._check_inputs)
+        if self._trajectory and isinstance(inputs_sigma, Sequence):
+            unary_state_id = self._unary_state_id(inputs_sigma)
+            if unary_state_id is not None:
+                return unary_state_id
+
+        return walk_rows(
+            self._rows,
+            self._state_to_id[self.initial_state_q0],
+            inputs_sigma,
+            self._step_by_id,
+        )
+
+    def _process_many_compiled(self, sequences: Iterable[Iterable[Any]]) -> list[int]:
+        """Table-driven equivalent of `process_many`; returns the id of each last state."""
+        check_inputs = self._check_inputs
+        if check_inputs is not None:
+            sequences = (_checked_inputs(inputs_sigma, check_inputs) for inputs_sigma in sequences)
+        return walk_rows_many(
+            self._rows,
+            self._state_to_id[self.initial_state_q0],
+            sequences,
+            self._step_by_id,
+        )
+
+    def _unary_state_id(self, inputs_sigma: Sequence[Any]) -> Optional[int]:
+        """Final state id of a single-symbol machine, found from the length of
+        `inputs_sigma` alone; None if the table has to be walked instead."""
+        n_inputs = len(inputs_sigma)
+        try:
+            n_symbols = inputs_sigma.count(self._symbols[0])
+        except TypeError:
+            # e.g. `str.count` with a symbol that isn't a str
+            return None
+        if n_symbols != n_inputs:
+            # Some input isn't the symbol; let the walk raise at the right place
+            return None
+        trajectory = self._trajectory
+        if n_inputs < len(trajectory):
+            return trajectory[n_inputs]
+        cycle_start = self._cycle_start
+        if cycle_start < 0:
+            # Runs into a transition that isn't tabulated
+            return None
+        return trajectory[cycle_start + (n_inputs - cycle_start) % (len(trajectory) - cycle_start)]
+
+    def _step_by_id(self, state_id: int, input_symbol: Any) -> int:
+        """`step` for a transition missing from the compiled table; normally raises."""
+        return self._state_to_id[self.step(self._states[state_id], input_symbol)]
+
+    def process_bytes(self, buf: bytes, symbol_mapper: Optional[Callable[[int], Any]] = None) -> Any:
+        """Process raw bytes, as `process` would process the input symbols
+        `symbol_mapper(byte)` for each byte of `buf`.
+
+        For a compiled machine with at most 255 input symbols, the whole
+        buffer is translated to symbol ids with one `bytes.translate` call
+        and the table is walked directly, so no per-byte symbol objects are
+        created. Otherwise this is the same as `process`.
+
+        Parameters
+        ----------
+        buf : bytes
+            Raw input
+        symbol_mapper : Optional[Callable[[int], Any]]
+            Maps a byte value to an input symbol; defaults to `chr`, so that
+            `b"0110"` is processed like `"0110"`. Must be pure, as a compiled
+            machine reuses the symbol it returned for each byte across calls
+
+        Returns
+        -------
+        Any
+            Last state after processing all inputs
+
+        Raises
+        ------
+        InvalidInputTokenError
+            If a mapped input symbol is not in `alphabet_sigma`
+        InvalidStateError
+            If `current_state` or `new_state` is not in `all_states_Q`
+        IllegalTransitionError
+            If the provided `transition_delta` raises IllegalTransitionError
+        TransitionFunctionError
+            If the provided `transition_delta` raises any other exception
+        """
+        if symbol_mapper is None:
+            symbol_mapper = chr
+        if self._table is None or len(self._symbols) > 255:
+            return self.process(map(symbol_mapper, buf))
+
+        # `==` rather than `is`, as each `d.get` is a new but equal bound method
+        if self._byte_table is not None and self._byte_table[0] == symbol_mapper:
+            byte_table = self._byte_table[1]
+        else:
+            byte_table = self._build_byte_table(symbol_mapper)
+            self._byte_table = (symbol_mapper, byte_table)
+
+        symbol_ids = buf.translate(byte_table)
+        symbols = self._symbols
+        state_id = self._state_to_id[self.initial_state_q0]
+        start = 0
+        while True:
+            invalid_at = symbol_ids.find(255, start)
+            state_id = walk_table_ids(
+                self._table,
+                len(symbols),
+                state_id,
+                symbol_ids[start:invalid_at] if invalid_at >= 0 else symbol_ids[start:],
+                lambda state_id, symbol_id: self._step_by_id(state_id, symbols[symbol_id]),
+            )
+            if invalid_at < 0:
+                return self._states[state_id]
+            # Normally raises InvalidInputTokenError; if the byte does map to a
+            # symbol after all, keep walking from the state it leads to
+            state_id = self._step_by_id(state_id, symbol_mapper(buf[invalid_at]))
+            start = invalid_at + 1
+
+    def _build_byte_table(self, symbol_mapper: Callable[[int], Any]) -> bytes:
+        """`bytes.translate` table from byte value to symbol id for `process_bytes`.
+
+        Bytes that don't map to a symbol of the alphabet become 255, including
+        those `symbol_mapper` fails on; it need not handle bytes absent from
+        the input, and for those that are present `process_bytes` calls it
+        again so it raises (or `step` does) as in the uncompiled machine.
+        """
+        symbol_to_id = self._symbol_to_id
+        check_inputs = self._check_inputs
+        symbol_ids = []
+        for byte in range(256):
+            try:
+                symbol = symbol_mapper(byte)
+                if check_inputs is not None and not check_inputs(symbol):
+                    symbol_ids.append(255)
+                else:
+                    symbol_ids.append(symbol_to_id.get(symbol, 255))
+            except Exception:
+                symbol_ids.append(255)
+        return bytes(symbol_ids)
+
     def process_and_check(self, inputs_sigma: Iterable[Any]) -> Any:
         """Process inputs and verify final state is accepting.
 
@@ -152,11 +460,113 @@ class LazyFiniteStateMachine:
         TransitionFunctionError
             If the provided `transition_delta` raises any other exception
         """
+        if self._table is not None:
+            # Test the accepting bit before translating the id back to a state
+            state_id = self._process_compiled(inputs_sigma)
+            if not (self._accepting >> state_id) & 1:
+                raise InvalidFinalStateError()
+            return self._states[state_id]
+
         final_state = self.process(inputs_sigma)
         if final_state not in self.final_states_F:
             raise InvalidFinalStateError()
         return final_state
 
+    def process_many(self, sequences: Iterable[Iterable[Any]]) -> list[Any]:
+        """Process several independent inputs, each starting from the
+        initial state of the machine. Equivalent to calling `process`
+        on each of them, but the machine's attributes are looked up once
+        for the whole batch rather than on every input symbol.
+
+        Parameters
+        ----------
+        sequences : Iterable[Iterable[Any]]
+            Independent sequences of input symbols
+
+        Returns
+        -------
+        list[Any]
+            Last state after processing each sequence, in the same order
+
+        Raises
+        ------
+        InvalidInputTokenError
+            If an input symbol is not in `alphabet_sigma`
+        InvalidStateError
+            If `current_state` or `new_state` is not in `all_states_Q`
+        IllegalTransitionError
+            If the provided `transition_delta` raises IllegalTransitionError
+        TransitionFunctionError
+            If the provided `transition_delta` raises any other exception
+        """
+        if self._table is not None:
+            states = self._states
+            return [states[state_id] for state_id in self._process_many_compiled(sequences)]
+
+        initial_state = self.initial_state_q0
+        transition_delta = self.transition_delta
+        all_states_contains = self._all_states_contains
+        alphabet_contains = self._alphabet_contains
+        final_states = []
+        for inputs_sigma in sequences:
+            # Same checks as `step`; the current state was already checked as the previous new state
+            state = initial_state
+            for val in inputs_sigma:
+                if alphabet_contains is not None and not alphabet_contains(val):
+                    raise InvalidInputTokenError()
+                try:
+                    state = transition_delta(state, val)
+                except IllegalTransitionError:
+                    raise
+                except Exception:
+                    raise TransitionFunctionError() from None
+                if not all_states_contains(state):
+                    raise InvalidStateError()
+            final_states.append(state)
+        return final_states
+
+    def process_and_check_many(self, sequences: Iterable[Iterable[Any]]) -> list[Any]:
+        """Process several independent inputs and verify each final state is accepting.
+
+        Parameters
+        ----------
+        sequences : Iterable[Iterable[Any]]
+            Independent sequences of input symbols
+
+        Returns
+        -------
+        list[Any]
+            Final state of each sequence, all of which are in final_states_F
+
+        Raises
+        ------
+        InvalidFinalStateError
+            If the final state of any sequence is not in `final_states_F`
+        InvalidInputTokenError
+            If an input symbol is not in `alphabet_sigma`
+        InvalidStateError
+            If `current_state` or `new_state` is not in `all_states_Q`
+        IllegalTransitionError
+            If the provided `transition_delta` raises IllegalTransitionError
+        TransitionFunctionError
+            If the provided `transition_delta` raises any other exception
+        """
+        if self._table is not None:
+            state_ids = self._process_many_compiled(sequences)
+            accepting = self._accepting
+            for state_id in state_ids:
+                if not (accepting >> state_id) & 1:
+                    raise InvalidFinalStateError()
+            states = self._states
+            return [states[state_id] for state_id in state_ids]
+
+        final_states = self.process_many(sequences)
+        final_states_F = self.final_states_F
+        for final_state in final_states:
+            if final_state not in final_states_F:
+                raise InvalidFinalStateError()
+        return final_states
+
     def step(self, current_state: Any, input_symbol: Any) -> Any:
         """Process one input symbol, given a current state.
 
@@ -181,9 +591,9 @@ class LazyFiniteStateMachine:
         TransitionFunctionError
             If the provided `transition_delta` raises any other exception
         """
-        if current_state not in self.all_states_Q:
+        if not self._all_states_contains(current_state):
             raise InvalidStateError()
-        if self.alphabet_sigma is not None and input_symbol not in self.alphabet_sigma:
+        if self._alphabet_contains is not None and not self._alphabet_contains(input_symbol):
             raise InvalidInputTokenError()
         try:
             new_state = self.transition_delta(current_state, input_symbol)
@@ -192,7 +602,7 @@ class LazyFiniteStateMachine:
         except Exception:
             raise TransitionFunctionError() from None
 
-        if new_state not in self.all_states_Q:
+        if not self._all_states_contains(new_state):
             raise InvalidStateError()
 
         return new_state
@@ -1,6 +1,7 @@
 import pytest
 
 from lazy_state_machine.exceptions import (
+    CompilationError,
     IllegalTransitionError,
     InvalidFinalStateError,
     InvalidFinalStatesError,
@@ -9,7 +10,7 @@ from lazy_state_machine.exceptions import (
     InvalidStateError,
     TransitionFunctionError,
 )
-from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine
+from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine, RangeSet
 
 """
 This file covers edge cases, and ensures the exceptions
@@ -18,18 +19,18 @@ are raised if invalid user input is provided.
 
 turnstile_states = ["locked", "unlocked"]
 turnstile_inputs = ["coin", "push"]
+# Keyed by state, then input
 turnstile_state_transitions = {
-    ("locked", "coin"): "unlocked",
-    ("locked", "push"): "locked",
-    ("unlocked", "coin"): "unlocked",
-    ("unlocked", "push"): "locked",
+    "locked": {"coin": "unlocked", "push": "locked"},
+    "unlocked": {"coin": "unlocked", "push": "locked"},
 }
 
 
 def turnstile_transition_function(state, input_symbol):
-    if (state, input_symbol) not in turnstile_state_transitions:
-        raise IllegalTransitionError(f"Invalid transition from {state} with input {input_symbol}")
-    return turnstile_state_transitions[(state, input_symbol)]
+    try:
+        return turnstile_state_transitions[state][input_symbol]
+    except KeyError:
+        raise IllegalTransitionError(f"Invalid transition from {state} with input {input_symbol}") from None
 
 
 def broken_transition_function(state, input_symbol):
@@ -127,3 +128,230 @@ def test_invalid_current_state_error():
 
     with pytest.raises(InvalidStateError):
         machine.step("broken by an angry customer", "coin")
+
+
+def test_compilation_error():
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+    )
+
+    with pytest.raises(CompilationError):
+        machine.compile()  # no alphabet_sigma to enumerate
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=lambda current_state, input_symbol: [1 - current_state[0]],
+        initial_state_q0=[0],
+        all_states_Q=([0], [1]),
+        alphabet_sigma=("flip",),
+    )
+    assert machine.process(["flip", "flip", "flip"]) == [1]
+    with pytest.raises(CompilationError):
+        machine.compile()  # list states can't be looked up in a dict
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=(["coin"],),
+    )
+    with pytest.raises(CompilationError):
+        machine.compile()  # nor list symbols
+
+
+def test_compiled_illegal_transition_error():
+    surprise_input = "surprise_input"
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset([*turnstile_inputs, surprise_input]),
+    )
+    machine.compile()
+
+    with pytest.raises(IllegalTransitionError):
+        machine.process(["coin", surprise_input])
+
+    with pytest.raises(IllegalTransitionError):
+        machine.process_bytes(b"cs", symbol_mapper={ord("c"): "coin", ord("s"): surprise_input}.get)
+
+
+def test_compiled_invalid_input_token_error():
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset(["coin"]),
+    )
+    machine.compile()
+
+    with pytest.raises(InvalidInputTokenError):
+        machine.process(["coin", "push"])
+
+    with pytest.raises(InvalidInputTokenError):
+        machine.process_bytes(b"cp", symbol_mapper={ord("c"): "coin", ord("p"): "push"}.get)
+
+
+def test_compiled_invalid_final_state_error():
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        final_states_F=frozenset(["locked"]),
+        alphabet_sigma=frozenset(turnstile_inputs),
+    )
+
+    with pytest.raises(InvalidFinalStateError):
+        machine.process_and_check_many([["push"], ["coin"]])
+
+    machine.compile()
+    assert machine.process_and_check(["coin", "push"]) == "locked"
+    with pytest.raises(InvalidFinalStateError):
+        machine.process_and_check(["coin"])
+    with pytest.raises(InvalidFinalStateError):
+        machine.process_and_check_many([["push"], ["coin"]])
+
+
+def test_process_many_errors():
+    def invalid_state_transition_function(state, input_symbol):
+        return "What states are we supposed to support again?"
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset(["coin", "push", "surprise_input"]),
+    )
+    with pytest.raises(IllegalTransitionError):
+        machine.process_many([["coin"], ["push", "surprise_input"]])
+    with pytest.raises(InvalidInputTokenError):
+        machine.process_many([["coin"], ["kick"]])
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=broken_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+    )
+    with pytest.raises(TransitionFunctionError):
+        machine.process_many([["coin"]])
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=invalid_state_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+    )
+    with pytest.raises(InvalidStateError):
+        machine.process_many([["coin"]])
+
+
+def test_compiled_unary_errors():
+    def unary_transition_function(state, input_symbol):
+        if state == "unlocked":
+            raise IllegalTransitionError("The turnstile only accepts one coin")
+        return "unlocked"
+
+    machine = LazyFiniteStateMachine(
+        transition_delta=unary_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset(["coin"]),
+    )
+    machine.compile()
+
+    assert machine.process(["coin"]) == "unlocked"
+    with pytest.raises(IllegalTransitionError):
+        machine.process(["coin", "coin"])
+    with pytest.raises(InvalidInputTokenError):
+        machine.process(["coin", "push"])
+
+    # `str.count` can't count a non-str symbol
+    machine = LazyFiniteStateMachine(
+        transition_delta=unary_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset([1]),
+    )
+    with pytest.raises(InvalidInputTokenError):
+        machine.process("1")
+    machine.compile()
+    with pytest.raises(InvalidInputTokenError):
+        machine.process("1")
+
+
+def test_compiled_process_bytes_partial_mapper():
+    """A mapper only needs to handle the bytes that occur in the input"""
+    symbol_mapper = {ord("c"): "coin", ord("p"): "push"}.__getitem__
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset(turnstile_inputs),
+    )
+    assert machine.process_bytes(b"cpc", symbol_mapper) == "unlocked"
+    with pytest.raises(KeyError):
+        machine.process_bytes(b"cx", symbol_mapper)
+
+    machine.compile()
+    assert machine.process_bytes(b"cpc", symbol_mapper) == "unlocked"
+    with pytest.raises(KeyError):
+        machine.process_bytes(b"cx", symbol_mapper)  # the mapper's own error, as uncompiled
+
+
+def test_compiled_process_bytes_stale_byte_table():
+    """An unmapped byte that turns out to be valid must not cut the input short"""
+    symbols_by_byte = {ord("c"): "coin"}
+    symbol_mapper = lambda byte: symbols_by_byte[byte]
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=frozenset(turnstile_states),
+        alphabet_sigma=frozenset(turnstile_inputs),
+    )
+    machine.compile()
+    assert machine.process_bytes(b"c", symbol_mapper) == "unlocked"
+
+    symbols_by_byte[ord("p")] = "push"
+    assert machine.process_bytes(b"cpcc", symbol_mapper) == "unlocked"
+    assert machine.process_bytes(b"cpcp", symbol_mapper) == "locked"
+
+
+def test_compiled_range_set_alphabet_rejects_bools():
+    """Compiling must not widen an alphabet whose membership is stricter than
+    equality; `True == 1`, but `RangeSet` does not contain it"""
+    machine = LazyFiniteStateMachine(
+        transition_delta=lambda current_state, input_symbol: (current_state * 2 + input_symbol) % 3,
+        initial_state_q0=0,
+        all_states_Q=RangeSet(3),
+        alphabet_sigma=RangeSet(2),
+    )
+    with pytest.raises(InvalidInputTokenError):
+        machine.process([True, False, True])
+
+    machine.compile()
+    assert machine.process([1, 0, 1]) == 2
+    with pytest.raises(InvalidInputTokenError):
+        machine.process([True, False, True])
+    with pytest.raises(InvalidInputTokenError):
+        machine.process_many([[1, 0], [True]])
+    with pytest.raises(InvalidInputTokenError):
+        machine.process_bytes(b"\x01", symbol_mapper=bool)
+
+
+def test_compiled_unhashable_input_token_error():
+    """With tuple alphabets an unhashable input is simply not a member;
+    the compiled machine must raise the same typed error as the lazy one"""
+    machine = LazyFiniteStateMachine(
+        transition_delta=turnstile_transition_function,
+        initial_state_q0="locked",
+        all_states_Q=tuple(turnstile_states),
+        alphabet_sigma=tuple(turnstile_inputs),
+    )
+    with pytest.raises(InvalidInputTokenError):
+        machine.process([["coin"]])
+
+    machine.compile()
+    with pytest.raises(InvalidInputTokenError):
+        machine.process([["coin"]])
+    with pytest.raises(InvalidInputTokenError):
+        machine.process_many([["coin"], [["coin"]]])
@@ -1,80 +1,101 @@
-from enum import Enum
+import functools
+from enum import IntEnum
 
-from lazy_state_machine.exceptions import IllegalTransitionError
-from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine
+import pytest
 
+from examples.FSM_modulus_three import CHUNK_SIZE, mod_three, mod_three_fast
+from lazy_state_machine.exceptions import IllegalTransitionError, TransitionFunctionError
+from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine, RangeSet
 
-class BinaryStringBit(Enum):
-    zero = "0"
-    one = "1"
+
+class BinaryStringBit(IntEnum):
+    # An IntEnum hashes and compares as a plain int; Enum's `__hash__` is a
+    # Python-level method, which dominated dict and set lookups on bits
+    zero = 0
+    one = 1
 
     @staticmethod
     def bits_from_string(s):
-        output = []
-        for c in s:
-            if c == "0":
-                output.append(BinaryStringBit.zero)
-            elif c == "1":
-                output.append(BinaryStringBit.one)
-            else:
-                raise ValueError(f"Only binary strings accepted, found character `{c}`")
-        return output
-
-
-def test_mod_three_explicit():
-    """Direct test case with hardcoded state transitions representing
-    a finite state machine that computes modulus 3 without using division
-    via explicit pre-derived logic."""
-
-    class States(Enum):
-        S0 = "S0"
-        S1 = "S1"
-        S2 = "S2"
-
-    # State transition table for modulus 3 finite automaton
-    state_transitions = {
-        (States.S0, BinaryStringBit.zero): States.S0,
-        (States.S0, BinaryStringBit.one): States.S1,
-        (States.S1, BinaryStringBit.zero): States.S2,
-        (States.S1, BinaryStringBit.one): States.S0,
-        (States.S2, BinaryStringBit.zero): States.S1,
-        (States.S2, BinaryStringBit.one): States.S2,
-    }
-
-    def explicit_transition_function(state, input_symbol):
-        # States explicitly accounted for
-        return state_transitions[(state, input_symbol)]
+        # Whatever is left after deleting every `0` and `1` is invalid
+        non_binary = s.translate(_DELETE_BINARY_DIGITS)
+        if non_binary:
+            raise ValueError(f"Only binary strings accepted, found character `{non_binary[0]}`")
+        return list(map(_BITS_BY_CHARACTER.__getitem__, s))
+
+    @staticmethod
+    def bits_from_int(n):
+        # Most significant bit first, like format(n, "b") but without the string
+        return [_BITS_BY_VALUE[(n >> i) & 1] for i in range(n.bit_length() - 1, -1, -1)]
+
+
+_DELETE_BINARY_DIGITS = str.maketrans("", "", "01")
+_BITS_BY_CHARACTER = {str(bit.value): bit for bit in BinaryStringBit}
+_BITS_BY_VALUE = (BinaryStringBit.zero, BinaryStringBit.one)
+# For `process_bytes` on ASCII binary strings
+_BITS_BY_BYTE = {ord(character): bit for character, bit in _BITS_BY_CHARACTER.items()}
+
+
+class States(IntEnum):
+    S0 = 0
+    S1 = 1
+    S2 = 2
 
+
+# State transition table for modulus 3 finite automaton, indexed by [state][bit];
+# both are IntEnums, so they index lists directly. Each state's value is its remainder
+_MOD_THREE_TRANSITIONS = [
+    [States.S0, States.S1],
+    [States.S2, States.S0],
+    [States.S1, States.S2],
+]
+
+
+def _explicit_transition_function(state, input_symbol):
+    # States explicitly accounted for
+    return _MOD_THREE_TRANSITIONS[state][input_symbol]
+
+
+@pytest.fixture(scope="module", params=["lazy", "compiled"])
+def mod_three_machine(request):
+    """Finite state machine with hardcoded state transitions that computes
+    modulus 3 without using division via explicit pre-derived logic; shared
+    by the tests below, once as given and once compiled"""
     machine = LazyFiniteStateMachine(
-        transition_delta=explicit_transition_function,
+        transition_delta=_explicit_transition_function,
         initial_state_q0=States.S0,
         all_states_Q=frozenset([States.S0, States.S1, States.S2]),
         final_states_F=frozenset([States.S0, States.S1, States.S2]),
+        alphabet_sigma=frozenset(BinaryStringBit),
     )
-    state_to_modulus_integer = {States.S0: 0, States.S1: 1, States.S2: 2}
+    if request.param == "compiled":
+        machine.compile()
+    return machine
+
 
-    # Specific test "110"  -> 0
-    example1_inputs = BinaryStringBit.bits_from_string("110")
-    example1_final_state = machine.process_and_check(example1_inputs)
-    example1_result = state_to_modulus_integer[example1_final_state]
-    assert example1_result == 0
+@pytest.mark.parametrize(("binary_string", "remainder"), [("110", 0), ("1010", 1)])
+def test_mod_three_explicit_examples(mod_three_machine, binary_string, remainder):
+    inputs = BinaryStringBit.bits_from_string(binary_string)
+    assert mod_three_machine.process_and_check(inputs) == remainder
 
-    # Specific test "1010" -> 1
-    example2_inputs = BinaryStringBit.bits_from_string("1010")
-    example2_final_state = machine.process_and_check(example2_inputs)
-    example2_result = state_to_modulus_integer[example2_final_state]
-    assert example2_result == 1
+    # The same input as raw bytes, without building a list of bits
+    final_state = mod_three_machine.process_bytes(binary_string.encode(), symbol_mapper=_BITS_BY_BYTE.get)
+    assert final_state == remainder
 
-    def check_modulus_3_fa(num):
-        """Check if finite automaton correctly computes num % 3"""
-        test_inputs = BinaryStringBit.bits_from_string(format(num, "b"))
-        calculated_mod_3_state = machine.process_and_check(test_inputs)
-        calculated_mod_3 = state_to_modulus_integer[calculated_mod_3_state]
-        correct_mod_3 = num % 3
-        return calculated_mod_3 == correct_mod_3
 
-    for n in range(1000):
-        assert check_modulus_3_fa(n)
+def test_mod_three_explicit(mod_three_machine):
+    """Check the finite automaton correctly computes n % 3, running every n as one batch"""
+    calculated_mod_3 = mod_three_machine.process_and_check_many(BinaryStringBit.bits_from_int(n) for n in range(1000))
+    correct_mod_3 = [n % 3 for n in range(1000)]
+    # The message, listing every wrong n, is only built if the assertion fails
+    assert calculated_mod_3 == correct_mod_3, [n for n in range(1000) if calculated_mod_3[n] != correct_mod_3[n]]
+
+
+@pytest.mark.parametrize("bit_length", [8, 16, 32, 64, 128])
+def test_mod_three_explicit_long_inputs(mod_three_machine, bit_length):
+    """Boundary values around powers of two, much longer than the numbers in the sweep above"""
+    numbers = [2**bit_length - 1, 2**bit_length, 2**bit_length + 1]
+    for n in numbers:
+        assert mod_three_machine.process_and_check(BinaryStringBit.bits_from_int(n)) == n % 3
 
 
 def test_modulus_dynamic():
@@ -94,6 +115,8 @@ def test_modulus_dynamic():
     (3000x in this case).
     """
 
+    # The machine only depends on the modulus, so build it once per modulus rather than once per n
+    @functools.cache
     def create_dynamic_modulus_machine(modulus):
         def dynamic_transition_function(current_state, input_symbol):
             # guarded from invalid input symbols via our specified alphabet
@@ -113,7 +136,7 @@ def test_modulus_dynamic():
             return next_state
 
         # States are 0 through modulus-1
-        all_states = frozenset(range(modulus))
+        all_states = RangeSet(modulus)
 
         return LazyFiniteStateMachine(
             transition_delta=dynamic_transition_function,
@@ -124,7 +147,7 @@ def test_modulus_dynamic():
 
     def check_modulus_dynamic(num, modulus):
         machine = create_dynamic_modulus_machine(modulus)
-        test_inputs = BinaryStringBit.bits_from_string(format(num, "b"))
+        test_inputs = BinaryStringBit.bits_from_int(num)
         calculated_remainder = machine.process_and_check(test_inputs)
         correct_remainder = num % modulus
         return calculated_remainder == correct_remainder
@@ -133,3 +156,127 @@ def test_modulus_dynamic():
     for modulus in range(1, 14):
         for n in range(101):
             assert check_modulus_dynamic(n, modulus)
+
+
+def test_modulus_process_bytes():
+    """Raw ASCII bytes can be fed to a machine whose alphabet is the characters `0` and `1`"""
+
+    def create_ascii_modulus_machine(modulus):
+        return LazyFiniteStateMachine(
+            transition_delta=lambda current_state, input_symbol: (current_state * 2 + int(input_symbol)) % modulus,
+            alphabet_sigma=frozenset("01"),
+            initial_state_q0=0,
+            all_states_Q=frozenset(range(modulus)),
+        )
+
+    for modulus in range(1, 14):
+        machine = create_ascii_modulus_machine(modulus)
+        machine.compile()
+        for n in range(101):
+            assert machine.process_bytes(format(n, "b").encode()) == n % modulus
+
+    uncompiled_machine = create_ascii_modulus_machine(7)
+    assert uncompiled_machine.process_bytes(b"1100100") == 100 % 7
+
+
+def test_modulus_process_bytes_reuses_byte_table():
+    """The byte table is built once for a `dict.get` mapper, though each `.get` is a new bound method"""
+
+    class CountingDict(dict):
+        calls = 0
+
+        def get(self, key, default=None):
+            CountingDict.calls += 1
+            return super().get(key, default)
+
+    bits_by_byte = CountingDict(_BITS_BY_BYTE)
+    machine = LazyFiniteStateMachine(
+        transition_delta=_explicit_transition_function,
+        initial_state_q0=States.S0,
+        all_states_Q=frozenset(States),
+        alphabet_sigma=frozenset(BinaryStringBit),
+    )
+    machine.compile()
+    for n in range(1, 6):
+        assert machine.process_bytes(format(n, "b").encode(), symbol_mapper=bits_by_byte.get) == n % 3
+    assert CountingDict.calls == 256
+
+
+def test_range_set():
+    states = RangeSet(3)
+    assert list(states) == [0, 1, 2]
+    assert len(states) == 3
+    assert 2 in states
+    assert 3 not in states
+    assert -1 not in states
+    assert True not in states  # bools are not states
+    assert "1" not in states
+
+    # Construction does not depend on the number of states
+    machine = LazyFiniteStateMachine(
+        transition_delta=lambda current_state, input_symbol: (current_state * 2 + input_symbol) % (2**64 - 59),
+        initial_state_q0=0,
+        all_states_Q=RangeSet(2**64 - 59),
+    )
+    assert machine.process([1] * 70) == (2**70 - 1) % (2**64 - 59)
+
+
+def test_modulus_unary():
+    """A machine that counts its inputs modulo some number only has one input symbol,
+    so once compiled its final state follows from the number of inputs alone"""
+
+    def create_counting_machine(modulus, offset):
+        # The first `offset` states form a tail leading into a cycle of length `modulus`
+        def counting_transition_function(current_state, input_symbol):
+            if current_state < offset:
+                return current_state + 1
+            return offset + (current_state - offset + 1) % modulus
+
+        return LazyFiniteStateMachine(
+            transition_delta=counting_transition_function,
+            alphabet_sigma=frozenset(["tick"]),
+            initial_state_q0=0,
+            all_states_Q=RangeSet(offset + modulus),
+        )
+
+    for modulus in range(1, 6):
+        for offset in range(4):
+            machine = create_counting_machine(modulus, offset)
+            expected_states = [machine.process(["tick"] * n) for n in range(30)]
+            machine.compile()
+            assert [machine.process(["tick"] * n) for n in range(30)] == expected_states
+            assert [machine.process(iter(["tick"] * n)) for n in range(30)] == expected_states
+
+    machine = create_counting_machine(7, 3)
+    machine.compile()
+    assert machine.process(("tick",) * 10**6) == 3 + (10**6 - 3) % 7
+
+
+def test_bits_from_string():
+    assert BinaryStringBit.bits_from_string("") == []
+    assert BinaryStringBit.bits_from_string("0110") == [
+        BinaryStringBit.zero,
+        BinaryStringBit.one,
+        BinaryStringBit.one,
+        BinaryStringBit.zero,
+    ]
+    with pytest.raises(ValueError, match="`2`"):
+        BinaryStringBit.bits_from_string("01201a")
+
+    assert BinaryStringBit.bits_from_int(0) == []
+    for n in range(1, 100):
+        assert BinaryStringBit.bits_from_int(n) == BinaryStringBit.bits_from_string(format(n, "b"))
+
+
+def test_mod_three_fast():
+    # Covers partial chunks as well as inputs spanning several CHUNK_SIZE chunks
+    for n in range(1, 2**12):
+        binary = format(n, "b")
+        assert mod_three_fast(binary) == mod_three(binary) == n % 3
+        # Leading zeros are stripped before the chunked lookup
+        assert mod_three_fast("000" + binary) == mod_three("000" + binary) == n % 3
+    # All-zero input strips down to an empty string and stays in the initial state
+    for zeros in ("0", "0000", "0" * (CHUNK_SIZE + 1)):
+        assert mod_three_fast(zeros) == mod_three(zeros) == 0
+    with pytest.raises(TransitionFunctionError):
+        mod_three_fast("10201")
@@ -0,0 +1,11 @@
+import itertools
+
+from examples.schrodingers_cat import RANDOM_BLOCK_BYTES, random_bits
+
+
+def test_random_bits():
+    # Run past the end of the first os.urandom block
+    n_bits = 8 * RANDOM_BLOCK_BYTES + 1
+    bits = list(itertools.islice(random_bits(), n_bits))
+    assert len(bits) == n_bits
+    assert set(bits) <= {0, 1}
@@ -1,51 +1,83 @@
+import pytest
+
 from lazy_state_machine.exceptions import IllegalTransitionError
 from lazy_state_machine.lazy_state_machine import LazyFiniteStateMachine
 
-turnstile_states = ["locked", "unlocked"]
-turnstile_inputs = ["coin", "push"]
+# Tuples rather than frozensets; for this few members a linear scan beats hashing
+turnstile_states = ("locked", "unlocked")
+turnstile_inputs = ("coin", "push")
 
+# Keyed by state, then input
 turnstile_state_transitions = {
-    ("locked", "coin"): "unlocked",
-    ("locked", "push"): "locked",
-    ("unlocked", "coin"): "unlocked",
-    ("unlocked", "push"): "locked",
+    "locked": {"coin": "unlocked", "push": "locked"},
+    "unlocked": {"coin": "unlocked", "push": "locked"},
 }
 
 
 def turnstile_transition_function(state, input_symbol):
-    if (state, input_symbol) not in turnstile_state_transitions:
-        raise IllegalTransitionError(f"Invalid transition from {state} with input {input_symbol}")
-    return turnstile_state_transitions[(state, input_symbol)]
-
+    try:
+        return turnstile_state_transitions[state][input_symbol]
+    except KeyError:
+        raise IllegalTransitionError(f"Invalid transition from {state} with input {input_symbol}") from None
 
-def test_turnstile_simple():
-    """This test case covers a turnstile, ending with a pushy customer who doesn't have
-    a coin"""
 
-    turnstile = LazyFiniteStateMachine(
+def create_turnstile():
+    return LazyFiniteStateMachine(
         transition_delta=turnstile_transition_function,
         initial_state_q0="locked",
-        all_states_Q=frozenset(turnstile_states),
-        final_states_F=frozenset(turnstile_states),
-        alphabet_sigma=frozenset(turnstile_inputs),
+        all_states_Q=turnstile_states,
+        final_states_F=turnstile_states,
+        alphabet_sigma=turnstile_inputs,
     )
+
+
+@pytest.fixture(scope="module")
+def turnstile():
+    """Shared by the tests that don't `compile` it"""
+    return create_turnstile()
+
+
+def test_turnstile_simple(turnstile):
+    """This test case covers a turnstile, ending with a pushy customer who doesn't have
+    a coin"""
     test_inputs = ["coin", "push", "coin", "push", "push", "push", "push"]
     final_state = turnstile.process_and_check(test_inputs)
     assert final_state == "locked"
 
 
-def test_turnstile_debugging():
+def test_turnstile_debugging(turnstile):
     """This test case shows how a developer might debug their implementation
     by manually testing inputs one at a time, e.g. in jupyter notebook"""
-    turnstile = LazyFiniteStateMachine(
-        transition_delta=turnstile_transition_function,
-        initial_state_q0="locked",
-        all_states_Q=frozenset(turnstile_states),
-        final_states_F=frozenset(turnstile_states),
-        alphabet_sigma=frozenset(turnstile_inputs),
-    )
-
     assert turnstile.step("locked", "coin") == "unlocked"
     assert turnstile.step("locked", "push") == "locked"
     assert turnstile.step("unlocked", "coin") == "unlocked"
     assert turnstile.step("unlocked", "push") == "locked"
+
+
+def test_turnstile_compiled():
+    """The compiled machine must agree with the lazy one on every input"""
+    turnstile = create_turnstile()
+    test_inputs = ["coin", "push", "coin", "coin", "push", "push", "coin"]
+    expected_states = [turnstile.process(test_inputs[:i]) for i in range(len(test_inputs) + 1)]
+
+    turnstile.compile()
+    assert [turnstile.process(test_inputs[:i]) for i in range(len(test_inputs) + 1)] == expected_states
+    assert turnstile.process_and_check(test_inputs) == "unlocked"
+
+
+def test_turnstile_process_many():
+    """Batch processing must match processing each input on its own, compiled or not"""
+    turnstile = create_turnstile()
+    sequences = [[], ["coin"], ["coin", "push"], ["push", "push", "coin"], ["coin", "coin", "push", "coin"]]
+    expected_states = [turnstile.process(inputs) for inputs in sequences]
+
+    assert turnstile.process_many(sequences) == expected_states
+    assert turnstile.process_and_check_many(sequences) == expected_states
+    turnstile.compile()
+    assert turnstile.process_many(sequences) == expected_states
+    assert turnstile.process_and_check_many(sequences) == expected_states
+
+
+def test_turnstile_illegal_transition():
+    with pytest.raises(IllegalTransitionError):
+        turnstile_transition_function("locked", "kick")